@@ -3,12 +3,16 @@ import logging
 import os
 import pathlib
 import sys
+import threading
 
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from importlib import import_module
-from typing import Callable, DefaultDict, Dict, List, Mapping, Optional, Tuple
+from types import TracebackType
+from typing import Callable, DefaultDict, Dict, List, Mapping, Optional, Tuple, Type
 
 import pynetbox
+import requests
 
 from pkg_resources import DistributionNotFound, get_distribution
 
@@ -16,15 +20,17 @@ from homer.capirca import CapircaGenerate
 from homer.config import HierarchicalConfig, load_yaml_config
 from homer.devices import Device, Devices
 from homer.exceptions import HomerAbortError, HomerError, HomerTimeoutError
-from homer.netbox import NetboxData, NetboxDeviceData, NetboxInventory
+from homer.netbox import NetboxBulkDeviceData, NetboxData, NetboxDeviceData, NetboxInventory
 from homer.templates import Renderer
-from homer.transports.junos import connected_device
+from homer.transports import ConnectionPool
 
 
 TIMEOUT_ATTEMPTS = 3
 """:py:class:`int`: the number of attempts to try when there is a timeout."""
 DIFF_EXIT_CODE = 99
 """:py:class:`int`: the exit code used when the diff command is executed and there is a diff."""
+PARALLEL_WORKERS = 16
+""":py:class:`int`: the default number of devices to act on in parallel."""
 
 
 try:
@@ -51,21 +57,27 @@ class Homer:
         """
         logger.debug('Initialized with configuration: %s', main_config)
         self._main_config = main_config
+        self._public_base_path = self._main_config['base_paths']['public']
         self.private_base_path = self._main_config['base_paths'].get('private', '')
-        self._config = HierarchicalConfig(
-            self._main_config['base_paths']['public'], private_base_path=self.private_base_path)
+        self._config = HierarchicalConfig(self._public_base_path, private_base_path=self.private_base_path)
 
+        self._parallel_workers = self._main_config.get('parallel_workers', PARALLEL_WORKERS)
         self._netbox_api = None
         self._device_plugin = None
         if self._main_config.get('netbox', {}):
             self._netbox_api = pynetbox.api(
                 self._main_config['netbox']['url'], token=self._main_config['netbox']['token'])
+            # Allow to reuse a connection to Netbox for each device processed in parallel
+            adapter = requests.adapters.HTTPAdapter(pool_maxsize=self._parallel_workers)
+            self._netbox_api.http_session = requests.Session()
+            self._netbox_api.http_session.mount('http://', adapter)
+            self._netbox_api.http_session.mount('https://', adapter)
             if self._main_config['netbox'].get('plugin', ''):
                 self._device_plugin = import_module(  # type: ignore
                     self._main_config['netbox']['plugin']).NetboxDeviceDataPlugin
 
         devices_all_config = load_yaml_config(
-            os.path.join(self._main_config['base_paths']['public'], 'config', 'devices.yaml'))
+            os.path.join(self._public_base_path, 'config', 'devices.yaml'))
         devices_config = {fqdn: data.get('config', {}) for fqdn, data in devices_all_config.items()}
 
         netbox_inventory = self._main_config.get('netbox', {}).get('inventory', {})
@@ -83,11 +95,42 @@ class Homer:
                 os.path.join(self.private_base_path, 'config', 'devices.yaml'))
 
         self._ignore_warning = self._main_config.get('transports', {}).get('junos', {}).get('ignore_warning', False)
-        self._transport_username = self._main_config.get('transports', {}).get('username', '')
-        self._transport_ssh_config = self._main_config.get('transports', {}).get('ssh_config', None)
         self._devices = Devices(devices, devices_config, private_devices_config)
-        self._renderer = Renderer(self._main_config['base_paths']['public'], self.private_base_path)
+        render_processes = self._main_config.get('render_processes', 0)
+        if render_processes and self._netbox_api is not None:
+            logger.warning('Rendering in multiple processes is not supported with Netbox, ignoring render_processes')
+            render_processes = 0
+
+        self._renderer = Renderer(self._public_base_path, self.private_base_path, processes=render_processes)
         self._output_base_path = pathlib.Path(self._main_config['base_paths']['output'])
+        self._confirm_lock = threading.Lock()
+        self._abort = threading.Event()
+        self._connections = ConnectionPool(username=self._main_config.get('transports', {}).get('username', ''),
+                                           ssh_config=self._main_config.get('transports', {}).get('ssh_config', None),
+                                           workers=self._parallel_workers)
+
+    def __enter__(self) -> 'Homer':
+        """Context manager entry point, allow to use the instance in a with statement.
+
+        Returns:
+            homer.Homer: the instance itself.
+
+        """
+        return self
+
+    def __exit__(self, exc_type: Optional[Type[BaseException]], exc_value: Optional[BaseException],
+                 traceback: Optional[TracebackType]) -> None:
+        """Context manager exit point, close all the open connections to the devices.
+
+        Parameters according to Python's datamodel, see:
+        https://docs.python.org/3/reference/datamodel.html#object.__exit__
+
+        """
+        self.close()
+
+    def close(self) -> None:
+        """Close all the connections to the devices that are still open."""
+        self._connections.close()
 
     def generate(self, query: str) -> int:
         """Generate the configuration only saving it locally, no remote action is performed.
@@ -100,8 +143,13 @@ class Homer:
 
         """
         logger.info('Generating configuration for query %s', query)
+        devices = self._devices.query(query)
+        if not devices:  # Do not touch the output directory
+            logger.warning('No devices matched query %s', query)
+            return 0
+
         self._prepare_out_dir()
-        successes, _ = self._execute(self._device_generate, query)
+        successes, _ = self._execute(self._device_generate, devices)
         return Homer._parse_results(successes)
 
     def diff(self, query: str, *, omit_diff: bool = False) -> int:
@@ -116,21 +164,27 @@ class Homer:
 
         """
         logger.info('Generating diff for query %s', query)
-        successes, diffs = self._execute(self._device_diff, query)
+        devices = self._devices.query(query)
+        successes, diffs = self._execute(self._device_diff, devices, connect=True)
         has_diff = False
+        lines = []  # Collect the whole output to write it at once
         for diff, diff_devices in diffs.items():
-            print('Changes for {n} devices: {devices}'.format(n=len(diff_devices), devices=diff_devices))
+            lines.append(f'Changes for {len(diff_devices)} devices: {diff_devices}')
             if diff is None:
-                print('# Failed')
+                lines.append('# Failed')
             elif not diff:
-                print('# No diff')
+                lines.append('# No diff')
             else:
                 has_diff = True
                 if omit_diff:
-                    print('# Non-empty diff omitted, -o/--omit-diff set')
+                    lines.append('# Non-empty diff omitted, -o/--omit-diff set')
                 else:
-                    print(diff)
-            print('---------------')
+                    lines.append(diff)
+            lines.append('---------------')
+
+        if lines:
+            sys.stdout.write('\n'.join(lines) + '\n')
+            sys.stdout.flush()  # Push the whole output at once, also when stdout is not line buffered
 
         ret = Homer._parse_results(successes)
         if ret == 0 and has_diff:
@@ -150,7 +204,12 @@ class Homer:
 
         """
         logger.info('Committing config for query %s with message: %s', query, message)
-        successes, _ = self._execute(self._device_commit, query, message=message)
+        if not sys.stdout.isatty():  # Fail fast before connecting to any device
+            logger.error('Not in a TTY, unable to ask for confirmation')
+            return 1
+
+        devices = self._devices.query(query)
+        successes, _ = self._execute(self._device_commit, devices, connect=True, message=message)
         return Homer._parse_results(successes)
 
     def _device_generate(self, device: Device, device_config: str, _: int) -> Tuple[bool, Optional[str]]:
@@ -166,10 +225,16 @@ class Homer:
             or not and a second element with a string or None that is not used but is required by the callback API.
 
         """
-        output_path = self._output_base_path / '{fqdn}{out}'.format(fqdn=device.fqdn, out=Homer.OUT_EXTENSION)
-        with open(str(output_path), 'w') as f:
-            f.write(device_config)
-            logger.info('Written configuration for %s in %s', device.fqdn, output_path)
+        output_path = self._output_base_path / f'{device.fqdn}{Homer.OUT_EXTENSION}'
+        data = memoryview(device_config.encode('utf-8'))
+        fd = os.open(str(output_path), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+        try:  # Write the whole configuration unbuffered, looping only in the unlikely case of partial writes
+            while data:
+                data = data[os.write(fd, data):]
+        finally:
+            os.close(fd)
+
+        logger.info('Written configuration for %s in %s', device.fqdn, output_path)
 
         return True, None
 
@@ -188,9 +253,8 @@ class Homer:
             to load the new configuration in the device to generate the diff.
 
         """
-        with connected_device(device.fqdn, username=self._transport_username,
-                              ssh_config=self._transport_ssh_config) as connection:
-            return connection.commit_check(device_config, self._ignore_warning)
+        connection = self._connections.get(device.fqdn)
+        return connection.commit_check(device_config, self._ignore_warning)
 
     def _device_commit(self, device: Device, device_config: str,  # noqa: MC0001; pylint: disable=no-self-use
                        attempt: int, *, message: str = '-') -> Tuple[bool, Optional[str]]:
@@ -212,54 +276,63 @@ class Homer:
         """
         def callback(fqdn: str, diff: str) -> None:
             """Callback as required by :py:class:`homer.transports.junos.ConnectedDevice.commit`."""
-            if not sys.stdout.isatty():
-                raise HomerError('Not in a TTY, unable to ask for confirmation')
-
-            print('Configuration diff for {fqdn}:\n{diff}'.format(fqdn=fqdn, diff=diff))
-            print('Type "yes" to commit, "no" to abort.')
-
-            for _ in range(2):
-                resp = input('> ')
-                if resp == 'yes':
-                    break
-                if resp == 'no':
-                    raise HomerAbortError('Commit aborted')
-
-                print(('Invalid response, please type "yes" to commit or "no" to abort. After 2 wrong answers the '
-                       'commit will be aborted.'))
-            else:
-                raise HomerAbortError('Too many invalid answers, commit aborted')
+            with self._confirm_lock:  # Do not interleave the confirmation prompts of devices processed in parallel
+                if self._abort.is_set():
+                    raise HomerAbortError('Execution interrupted, commit aborted')
+
+                print(f'Configuration diff for {fqdn}:\n{diff}')
+                print('Type "yes" to commit, "no" to abort.')
+
+                for _ in range(2):
+                    resp = input('> ')
+                    if self._abort.is_set():  # The execution was interrupted while waiting for the answer
+                        raise HomerAbortError('Execution interrupted, commit aborted')
+                    if resp == 'yes':
+                        break
+                    if resp == 'no':
+                        raise HomerAbortError('Commit aborted')
+
+                    print(('Invalid response, please type "yes" to commit or "no" to abort. After 2 wrong answers the '
+                           'commit will be aborted.'))
+                else:
+                    raise HomerAbortError('Too many invalid answers, commit aborted')
 
         is_retry = (attempt != 1)
-        with connected_device(device.fqdn, username=self._transport_username,
-                              ssh_config=self._transport_ssh_config) as connection:
-            try:
-                connection.commit(device_config, message, callback, ignore_warning=self._ignore_warning,
-                                  is_retry=is_retry)
-                return True, ''
-            except HomerTimeoutError:
-                raise  # To be catched later for automatic retry
-            except HomerAbortError as e:
-                logger.warning('%s on %s', e, device.fqdn)
-            except Exception as e:  # pylint: disable=broad-except
-                logger.error('Failed to commit on %s: %s', device.fqdn, e)
-                logger.debug('Traceback:', exc_info=True)
-
-            return False, ''
+        connection = self._connections.get(device.fqdn)
+        try:
+            connection.commit(device_config, message, callback, ignore_warning=self._ignore_warning,
+                              is_retry=is_retry)
+            success = True
+        except HomerTimeoutError:
+            self._connections.release(device.fqdn)  # Retry with a fresh connection
+            raise  # To be catched later for automatic retry
+        except HomerAbortError as e:
+            logger.warning('%s on %s', e, device.fqdn)
+            success = False
+        except Exception as e:  # pylint: disable=broad-except
+            logger.error('Failed to commit on %s: %s', device.fqdn, e)
+            logger.debug('Traceback:', exc_info=True)
+            success = False
+
+        return success, ''
 
     def _prepare_out_dir(self) -> None:
         """Prepare the out directory creating the directory if doesn't exists and deleting any pre-generated file."""
         self._output_base_path.mkdir(parents=True, exist_ok=True)
-        for path in self._output_base_path.iterdir():
-            if path.is_file() and path.suffix == Homer.OUT_EXTENSION:
-                path.unlink()
+        with os.scandir(str(self._output_base_path)) as entries:  # DirEntry caches the file type, saving a stat()
+            for entry in entries:
+                if entry.name.endswith(Homer.OUT_EXTENSION) and entry.is_file():
+                    os.unlink(entry.path)
 
-    def _execute(self, callback: Callable, query: str, **kwargs: str) -> Tuple[Dict, DefaultDict]:  # noqa, mccabe: MC0001 too complex
-        """Execute Homer based on the given action and query.
+    def _execute(self, callback: Callable, devices: List[Device], *, connect: bool = False,
+                 **kwargs: str) -> Tuple[Dict, DefaultDict]:
+        """Execute Homer based on the given action and devices, processing the devices in parallel.
 
         Arguments:
             callback (Callable): the callback to call for each device.
-            query (str): the query to filter the devices to act on.
+            devices (list): the list of :py:class:`homer.devices.Device` to act on.
+            connect (bool, optional): whether the callback acts on the devices through a connection, that is then
+                opened in advance while generating the configuration.
             **kwargs (str): any additional keyword argument to pass to the callback
 
         Returns:
@@ -269,54 +342,129 @@ class Homer:
             configuration differences and as values the list of device FQDN that reported that diff.
 
         """
-        diffs: DefaultDict[str, list] = defaultdict(list)
         successes: Dict[bool, list] = {True: [], False: []}
+        append_success = successes[True].append
+        append_failure = successes[False].append
         netbox_data = None
+        netbox_bulk_data = None
         if self._netbox_api is not None:
             logger.info('Gathering global Netbox data')
             netbox_data = NetboxData(self._netbox_api)
+            netbox_bulk_data = NetboxBulkDeviceData(self._netbox_api, devices)
 
-        for device in self._devices.query(query):
-            logger.info('Generating configuration for %s', device.fqdn)
+        self._renderer.preload(device.metadata['role'] for device in devices)
+        results: List[Tuple[str, bool, Optional[str]]] = []
+        self._abort.clear()
+        with self._renderer.worker_processes(), ThreadPoolExecutor(max_workers=self._parallel_workers) as executor:
+            try:
+                # Results are collected in submission order to keep the output stable across runs
+                for result in executor.map(
+                        lambda device: self._process_device(
+                            device, callback, netbox_data, netbox_bulk_data, connect=connect, **kwargs),
+                        devices):
+                    results.append(result)
+                    (append_success if result[1] else append_failure)(result[0])
+            except BaseException:
+                # Only the devices not yet started are cancelled, prevent the ones in progress from committing
+                self._abort.set()
+                raise
+
+        # Group the devices by diff only once all of them have been processed
+        diffs: DefaultDict[Optional[str], list] = defaultdict(list)
+        for fqdn, _, device_diff in results:
+            diffs[device_diff].append(fqdn)
 
+        return successes, diffs
+
+    def _process_device(self, device: Device, callback: Callable,  # pylint: disable=too-many-arguments
+                        netbox_data: Optional[NetboxData], netbox_bulk_data: Optional[NetboxBulkDeviceData], *,
+                        connect: bool = False, **kwargs: str) -> Tuple[str, bool, Optional[str]]:
+        """Generate the configuration for a single device and execute the given callback on it.
+
+        Arguments:
+            device (homer.devices.Device): the device instance.
+            callback (Callable): the callback to call for the device.
+            netbox_data (homer.netbox.NetboxData, None): the global Netbox data, if Netbox is configured.
+            netbox_bulk_data (homer.netbox.NetboxBulkDeviceData, None): the Netbox data gathered in bulk for all the
+                devices, if Netbox is configured.
+            connect (bool, optional): whether to open the connection to the device while generating its configuration.
+            **kwargs (str): any additional keyword argument to pass to the callback
+
+        Returns:
+            tuple: a three-element tuple with the device FQDN, a boolean that represent the success of the operation
+            or not and the configuration differences reported by the callback, :py:data:`None` if the device failed
+            to render the configuration or to connect to it.
+
+        """
+        logger.info('Generating configuration for %s', device.fqdn)
+        if connect:  # Open the connection in the background while generating the configuration
+            self._connections.warmup(device.fqdn)
+
+        try:
             try:
-                device_config = []
-                device_data = self._config.get(device)
-                # Render the ACLs using Capirca
-                if 'capirca' in device_data:
-                    capirca = CapircaGenerate(self._main_config, device_data['capirca'], self._netbox_api)
-                    generated_acls = capirca.generate_acls()
-                    if generated_acls:
-                        device_config.extend(generated_acls)
-
-                if netbox_data is not None:
-                    device_data['netbox'] = {
-                        'global': netbox_data,
-                        'device': NetboxDeviceData(self._netbox_api, device),
-                    }
-                    if self._device_plugin is not None:
-                        device_data['netbox']['device_plugin'] = self._device_plugin(self._netbox_api, device)
-                # Render the Jinja templates based on yaml + netbox data
-                device_config.append(self._renderer.render(device.metadata['role'], device_data))
+                device_config = self._generate_device_config(device, netbox_data, netbox_bulk_data)
             except HomerError:
                 logger.exception('Device %s failed to render the template, skipping.', device.fqdn)
-                successes[False].append(device.fqdn)
-                continue
+                return device.fqdn, False, None
+
+            if connect:
+                try:
+                    self._connections.get(device.fqdn)
+                except Exception as e:  # pylint: disable=broad-except
+                    logger.error('Unable to connect to %s, skipping: %s', device.fqdn, e)
+                    logger.debug('Traceback:', exc_info=True)
+                    return device.fqdn, False, None
 
             for attempt in range(1, TIMEOUT_ATTEMPTS + 1):
                 try:
-                    device_success, device_diff = callback(device, '\n'.join(device_config), attempt, **kwargs)
+                    device_success, device_diff = callback(device, device_config, attempt, **kwargs)
                     break
                 except HomerTimeoutError as e:
                     logger.error('Commit attempt %d/%d failed: %s', attempt, TIMEOUT_ATTEMPTS, e)
             else:
                 device_success = False
                 device_diff = ''
+        finally:
+            self._connections.release(device.fqdn)  # Do not keep the connection open once done with the device
 
-            successes[device_success].append(device.fqdn)
-            diffs[device_diff].append(device.fqdn)
+        return device.fqdn, device_success, device_diff
 
-        return successes, diffs
+    def _generate_device_config(self, device: Device, netbox_data: Optional[NetboxData],
+                                netbox_bulk_data: Optional[NetboxBulkDeviceData]) -> str:
+        """Generate the configuration for a single device.
+
+        Arguments:
+            device (homer.devices.Device): the device instance.
+            netbox_data (homer.netbox.NetboxData, None): the global Netbox data, if Netbox is configured.
+            netbox_bulk_data (homer.netbox.NetboxBulkDeviceData, None): the Netbox data gathered in bulk for all the
+                devices, if Netbox is configured.
+
+        Raises:
+            homer.exceptions.HomerError: if unable to generate the configuration.
+
+        Returns:
+            str: the generated configuration.
+
+        """
+        device_config = []
+        device_data = self._config.get(device)
+        # Render the ACLs using Capirca
+        if 'capirca' in device_data:
+            capirca = CapircaGenerate(self._main_config, device_data['capirca'], self._netbox_api)
+            generated_acls = capirca.generate_acls()
+            if generated_acls:
+                device_config.extend(generated_acls)
+
+        if netbox_data is not None:
+            device_data['netbox'] = {
+                'global': netbox_data,
+                'device': NetboxDeviceData(self._netbox_api, device, bulk_data=netbox_bulk_data),
+            }
+            if self._device_plugin is not None:
+                device_data['netbox']['device_plugin'] = self._device_plugin(self._netbox_api, device)
+        # Render the Jinja templates based on yaml + netbox data
+        device_config.append(self._renderer.render(device.metadata['role'], device_data))
+        return '\n'.join(device_config)
 
     @staticmethod
     def _parse_results(successes: Mapping[bool, List[Device]]) -> int:
@@ -334,5 +482,6 @@ class Homer:
             logger.error('Homer run had issues on %d devices: %s', len(successes[False]), successes[False])
             return 1
 
-        logger.info('Homer run completed successfully on %d devices: %s', len(successes[True]), successes[True])
+        logger.info('Homer run completed successfully on %d devices', len(successes[True]))
+        logger.debug('Successful devices: %s', successes[True])
         return 0
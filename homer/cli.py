@@ -65,8 +65,8 @@ def main(argv: Optional[list] = None) -> int:
         kwargs['omit_diff'] = args.omit_diff
 
     config = load_yaml_config(args.config)
-    runner = Homer(config)
-    return getattr(runner, args.action)(args.query, **kwargs)
+    with Homer(config) as runner:
+        return getattr(runner, args.action)(args.query, **kwargs)
 
 
 if __name__ == '__main__':
@@ -13,7 +13,15 @@ import yaml
 from homer.devices import Device
 from homer.exceptions import HomerError
 
+try:
+    from yaml import CSafeLoader as SafeLoader  # Use the faster LibYAML based loader, if available
+except ImportError:  # pragma: no cover - depends on how PyYAML was built
+    from yaml import SafeLoader
+
+
 logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
+NETWORK_RE = re.compile(r"^(\d+\.\d+\.\d+\.\d+|(?:[\da-f]{0,4}:){2,7}[\da-f]{0,4})/\d+$")
+IP_RE = re.compile(r"^(\d+\.\d+\.\d+\.\d+|(?:[\da-f]{0,4}:){2,7}[\da-f]{0,4})$")
 
 
 def ip_network_constructor(loader: yaml.constructor.BaseConstructor, node: str) -> Union[str,
@@ -65,6 +73,16 @@ def ip_address_constructor(loader: yaml.constructor.BaseConstructor, node: str)
         return value
 
 
+class HomerLoader(SafeLoader):  # pylint: disable=too-many-ancestors
+    """YAML safe loader that converts IP addresses, networks and interfaces into :py:mod:`ipaddress` objects."""
+
+
+HomerLoader.add_constructor('!ip_network', ip_network_constructor)
+HomerLoader.add_implicit_resolver('!ip_network', NETWORK_RE, None)
+HomerLoader.add_constructor('!ip_address', ip_address_constructor)
+HomerLoader.add_implicit_resolver('!ip_address', IP_RE, None)
+
+
 def load_yaml_config(config_file: str) -> Dict:
     """Parse a YAML config file and return it.
 
@@ -78,20 +96,13 @@ def load_yaml_config(config_file: str) -> Dict:
         HomerError: if failed to load the configuration.
 
     """
-    network_re = re.compile(r"^(\d+\.\d+\.\d+\.\d+|(?:[\da-f]{0,4}:){2,7}[\da-f]{0,4})/\d+$")
-    ip_re = re.compile(r"^(\d+\.\d+\.\d+\.\d+|(?:[\da-f]{0,4}:){2,7}[\da-f]{0,4})$")
-    yaml.SafeLoader.add_constructor("!ip_network", ip_network_constructor)
-    yaml.SafeLoader.add_implicit_resolver('!ip_network', network_re, None)
-    yaml.SafeLoader.add_constructor("!ip_address", ip_address_constructor)
-    yaml.SafeLoader.add_implicit_resolver('!ip_address', ip_re, None)
-
     config: Dict = {}
     if not os.path.exists(config_file):
         return config
 
     try:
         with open(config_file, 'r') as fh:
-            config = yaml.safe_load(fh)
+            config = yaml.load(fh, Loader=HomerLoader)  # nosec - HomerLoader is a SafeLoader
 
     except Exception as e:  # pylint: disable=broad-except
         raise HomerError('Could not load config file {file}: {e}'.format(file=config_file, e=e)) from e
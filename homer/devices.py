@@ -1,6 +1,7 @@
 """Devices module."""
 import fnmatch
 import logging
+import re
 
 from collections import UserDict
 from operator import attrgetter
@@ -56,8 +57,10 @@ class Devices(UserDict):  # pylint: disable=too-many-ancestors
         if ':' in query_string:  # Simple key-value query
             key, value = query_string.split(':', 1)
             results = [device for device in self.data.values() if device.metadata.get(key, None) == value]
-        else:  # FQDN query
-            results = [device for fqdn, device in self.items() if fnmatch.fnmatch(fqdn, query_string)]
+        else:  # FQDN query, the glob pattern is compiled only once for all the devices
+            matcher = re.compile(fnmatch.translate(query_string))
+            logger.debug('Compiled query matcher: %r', matcher)
+            results = [device for fqdn, device in self.data.items() if matcher.match(fqdn)]
 
         logger.info("Matched %d device(s) for query '%s'", len(results), query_string)
         return sorted(results, key=attrgetter('fqdn'))
@@ -1,9 +1,10 @@
 """Netbox module."""
 import ipaddress
 import logging
+import threading
 
-from collections import UserDict
-from typing import Any, Dict, List, Optional, Sequence
+from collections import defaultdict, UserDict
+from typing import Any, DefaultDict, Dict, List, Optional, Sequence
 
 import pynetbox
 
@@ -12,10 +13,17 @@ from homer.exceptions import HomerError
 
 
 logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
+BULK_FILTER_SIZE = 100
+""":py:class:`int`: the maximum number of device IDs to filter for in a single Netbox API call."""
 
 
 class BaseNetboxData(UserDict):  # pylint: disable=too-many-ancestors
-    """Base class to gather data dynamically from Netbox."""
+    """Base class to gather data dynamically from Netbox.
+
+    The instances are cheap to create, as no call to the Netbox API is performed until a key is accessed, and each key
+    is gathered only once, also when accessed concurrently from multiple threads.
+
+    """
 
     def __init__(self, api: pynetbox.api):
         """Initialize the dictionary.
@@ -26,6 +34,8 @@ class BaseNetboxData(UserDict):  # pylint: disable=too-many-ancestors
         """
         super().__init__()
         self._api = api
+        self._locks: DefaultDict[str, threading.Lock] = defaultdict(threading.Lock)
+        self._locks_lock = threading.Lock()
 
     def __getitem__(self, key: Any) -> Any:
         """Dynamically call the related method, if exists, to return the requested data.
@@ -41,11 +51,15 @@ class BaseNetboxData(UserDict):  # pylint: disable=too-many-ancestors
         if not hasattr(self, method_name):
             raise KeyError(key)
 
-        if key not in self.data:
-            try:
-                self.data[key] = getattr(self, method_name)()
-            except Exception as e:
-                raise HomerError('Failed to get key {key}'.format(key=key)) from e
+        with self._locks_lock:
+            key_lock = self._locks[key]
+
+        with key_lock:  # Let the other threads wait for the key to be gathered instead of making their own calls
+            if key not in self.data:
+                try:
+                    self.data[key] = getattr(self, method_name)()
+                except Exception as e:
+                    raise HomerError('Failed to get key {key}'.format(key=key)) from e
 
         return self.data[key]
 
@@ -78,9 +92,81 @@ class NetboxData(BaseNetboxData):  # pylint: disable=too-many-ancestors
         return [dict(i) for i in self._api.ipam.vlans.all()]
 
 
+class NetboxBulkDeviceData:
+    """Gather device-specific data from Netbox in bulk for multiple devices, lazily on first access."""
+
+    def __init__(self, api: pynetbox.api, devices: Sequence[Device]):
+        """Initialize the instance.
+
+        Arguments:
+            api (pynetbox.api): the Netbox API instance.
+            devices (list): the devices for which to gather the data. Devices without a Netbox object in their
+                metadata are ignored.
+
+        """
+        self._api = api
+        self._device_ids = {device.metadata['netbox_object'].id for device in devices
+                            if 'netbox_object' in device.metadata}
+        self._data: Dict[str, Dict[int, List[Any]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, endpoint: str, device_id: int) -> Optional[List[Any]]:
+        """Get the objects of a DCIM endpoint for a device, fetching them for all the devices on the first call.
+
+        Arguments:
+            endpoint (str): the name of the pynetbox DCIM endpoint, the objects must have a ``device`` attribute.
+            device_id (int): the Netbox ID of the device.
+
+        Returns:
+            list: the objects of the given endpoint that are related to the device.
+            None: if the device is not one of the devices managed by this instance.
+
+        """
+        if device_id not in self._device_ids:
+            return None
+
+        with self._lock:  # Let the other devices wait for the bulk call instead of making their own
+            if endpoint not in self._data:
+                self._data[endpoint] = self._fetch(endpoint)
+
+        return self._data[endpoint].get(device_id, [])
+
+    def _fetch(self, endpoint: str) -> Dict[int, List[Any]]:
+        """Fetch the objects of a DCIM endpoint for all the devices.
+
+        Arguments:
+            endpoint (str): the name of the pynetbox DCIM endpoint.
+
+        Returns:
+            dict: a dictionary with the Netbox device IDs as keys and the list of their objects as values.
+
+        """
+        logger.debug('Gathering %s from Netbox for %d devices', endpoint, len(self._device_ids))
+        device_ids = sorted(self._device_ids)
+        objects: Dict[int, List[Any]] = defaultdict(list)
+        for i in range(0, len(device_ids), BULK_FILTER_SIZE):
+            for obj in getattr(self._api.dcim, endpoint).filter(device_id=device_ids[i:i + BULK_FILTER_SIZE]):
+                objects[obj.device.id].append(obj)
+
+        return objects
+
+
 class NetboxDeviceData(BaseNetboxDeviceData):  # pylint: disable=too-many-ancestors
     """Dynamic dictionary to gather the required device-specific data from Netbox."""
 
+    def __init__(self, api: pynetbox.api, device: Device, *, bulk_data: Optional[NetboxBulkDeviceData] = None):
+        """Initialize the dictionary.
+
+        Arguments:
+            api (pynetbox.api): the Netbox API instance.
+            device (homer.devices.Device): the device for which to gather the data.
+            bulk_data (homer.netbox.NetboxBulkDeviceData, optional): if set, use it to get the data gathered in bulk
+                for multiple devices, falling back to the per-device API calls for the devices it doesn't manage.
+
+        """
+        super().__init__(api, device)
+        self._bulk_data = bulk_data
+
     def _get_virtual_chassis_members(self) -> Optional[List[Dict[str, Any]]]:
         """Returns a list of devices part of the same virtual chassis or None.
 
@@ -128,7 +214,7 @@ class NetboxDeviceData(BaseNetboxDeviceData):  # pylint: disable=too-many-ancest
 
         """
         device_id = self._device.metadata['netbox_object'].id
-        return [dict(i) for i in self._api.dcim.inventory_items.filter(device_id=device_id)]
+        return [dict(i) for i in self._filter('inventory_items', device_id)]
 
     def _get_vlans(self) -> Dict[int, Any]:
         """Returns all the vlans defined on a device.
@@ -140,7 +226,7 @@ class NetboxDeviceData(BaseNetboxDeviceData):  # pylint: disable=too-many-ancest
         vlans = {}
         device_id = self._device.metadata['netbox_object'].id
 
-        for interface in self._api.dcim.interfaces.filter(device_id=device_id):
+        for interface in self._filter('interfaces', device_id):
             if interface.untagged_vlan and interface.untagged_vlan.vid not in vlans:
                 vlans[interface.untagged_vlan.vid] = interface.untagged_vlan
             if interface.tagged_vlans:
@@ -149,6 +235,24 @@ class NetboxDeviceData(BaseNetboxDeviceData):  # pylint: disable=too-many-ancest
                         vlans[tagged_vlan.vid] = tagged_vlan
         return vlans
 
+    def _filter(self, endpoint: str, device_id: int) -> List[Any]:
+        """Get the objects of a DCIM endpoint for the device, from the bulk data if available.
+
+        Arguments:
+            endpoint (str): the name of the pynetbox DCIM endpoint.
+            device_id (int): the Netbox ID of the device.
+
+        Returns:
+            list: the objects of the given endpoint that are related to the device.
+
+        """
+        if self._bulk_data is not None:
+            objects = self._bulk_data.get(endpoint, device_id)
+            if objects is not None:
+                return objects
+
+        return list(getattr(self._api.dcim, endpoint).filter(device_id=device_id))
+
 
 class NetboxInventory:
     """Use Netbox as inventory to gather the list of devices to manage."""
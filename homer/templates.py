@@ -1,8 +1,12 @@
 """Templates module."""
 import logging
+import multiprocessing
 import os
 
-from typing import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Iterable, Iterator, Mapping, Optional
 
 from ansible_collections.ansible.netcommon.plugins.filter.ipaddr import ipaddr
 import jinja2
@@ -15,10 +19,44 @@ from homer.exceptions import HomerError
 logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
 
 
+@lru_cache(maxsize=None)
+def _get_renderer(base_path: str, base_private_path: str) -> 'Renderer':
+    """Get a renderer instance, creating it only once per process to reuse its cache of compiled templates.
+
+    Arguments:
+        base_path (str): the public base path.
+        base_private_path (str): the private base path.
+
+    Returns:
+        homer.templates.Renderer: the renderer instance.
+
+    """
+    return Renderer(base_path, base_private_path)
+
+
+def _render_worker(base_path: str, base_private_path: str, template_name: str, data: Mapping) -> str:
+    """Render a template, to be executed in a worker process.
+
+    Arguments:
+        base_path (str): the public base path.
+        base_private_path (str): the private base path.
+        template_name (str): the name of the template to load without the file extension.
+        data (dict): the dictionary of variables to pass to Jinja2 for replacement.
+
+    Raises:
+        HomerError: on error.
+
+    Returns:
+        str: the rendered template.
+
+    """
+    return _get_renderer(base_path, base_private_path).render(template_name, data)
+
+
 class Renderer:
     """Load and render templates."""
 
-    def __init__(self, base_path: str, base_private_path: str = ''):
+    def __init__(self, base_path: str, base_private_path: str = '', *, processes: int = 0):
         """Initialize the instance.
 
         Arguments:
@@ -26,8 +64,15 @@ class Renderer:
                 relative to this base path.
             base_private_path (str, optional): a secondary base path to initialize the Jinja2 environment with.
                 Templates that are not found in base_path will be looked up in this secondary private location.
+            processes (int, optional): the number of worker processes to render the templates with, within the
+                :py:meth:`homer.templates.Renderer.worker_processes` context. If zero the templates are rendered in
+                the current process.
 
         """
+        self._base_path = base_path
+        self._base_private_path = base_private_path
+        self._processes = processes
+        self._pool: Optional[ProcessPoolExecutor] = None
         paths = [os.path.join(base_path, 'templates')]
         if base_private_path:
             paths.append(os.path.join(base_private_path, 'templates'))
@@ -37,10 +82,50 @@ class Renderer:
             undefined=jinja2.StrictUndefined,
             trim_blocks=True,
             lstrip_blocks=True,
-            cache_size=0)
+            cache_size=-1,  # Compile each template only once, it's used for all the devices with the same role
+            auto_reload=False)
 
         self._env.filters['ipaddr'] = ipaddr
 
+    @contextmanager
+    def worker_processes(self) -> Iterator[None]:
+        """Context manager to render the templates in worker processes, if configured to do so.
+
+        The worker processes are spawned instead of forked, as the templates are rendered from multiple threads.
+
+        Yields:
+            None: it just gives back control to the caller.
+
+        """
+        if not self._processes:
+            yield
+            return
+
+        self._pool = ProcessPoolExecutor(max_workers=self._processes, mp_context=multiprocessing.get_context('spawn'))
+        try:
+            yield
+        finally:
+            self._pool.shutdown()
+            self._pool = None
+
+    def preload(self, template_names: Iterable[str]) -> None:
+        """Load and compile in advance the given templates, to have them already cached when rendering.
+
+        Templates that fail to load are skipped, the error will be raised when trying to render them. Nothing is
+        loaded if rendering in worker processes, as each of them compiles its own templates.
+
+        Arguments:
+            template_names (iterable): the names of the templates to load without the file extension.
+
+        """
+        if self._processes:
+            return
+
+        for template_name in set(template_names):
+            try:
+                self._env.get_template('{name}.conf'.format(name=template_name))
+            except jinja2.exceptions.TemplateError as e:
+                logger.debug('Unable to preload template %s: %s', template_name, e)
 
     def render(self, template_name: str, data: Mapping) -> str:
         """Render a template with the given data.
@@ -57,6 +142,10 @@ class Renderer:
             None: on failure.
 
         """
+        if self._pool is not None:
+            return self._pool.submit(
+                _render_worker, self._base_path, self._base_private_path, template_name, data).result()
+
         template_file = '{name}.conf'.format(name=template_name)
         try:
             template = self._env.get_template(template_file)
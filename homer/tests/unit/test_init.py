@@ -1,6 +1,7 @@
 """__init__ module tests."""
 import textwrap
 
+from concurrent.futures import ProcessPoolExecutor
 from unittest import mock
 
 import pytest
@@ -72,6 +73,16 @@ class TestHomer:
         with open(str(self.output / 'device2.example.com.out')) as f:
             assert textwrap.dedent(expected).lstrip('\n') == f.read()
 
+    def test_generate_no_devices(self):
+        """It should not touch the output directory if there are no matching devices."""
+        spurious_file = self.output / 'spurious{suffix}'.format(suffix=homer.Homer.OUT_EXTENSION)
+        spurious_file.touch()
+
+        ret = self.homer.generate('nonexistent*')
+
+        assert ret == 0
+        assert spurious_file.exists()
+
     def test_generate_no_private(self):
         """It should execute the whole program based on CLI arguments."""
         config = self.config.copy()
@@ -93,6 +104,21 @@ class TestHomer:
         with open(str(self.output / 'device2.example.com.out')) as f:
             assert textwrap.dedent(expected).lstrip('\n') == f.read()
 
+    def test_generate_render_processes(self):
+        """It should generate the same configuration files rendering the templates in worker processes."""
+        assert self.homer.generate('*') == 1
+        expected = {path.name: path.read_text() for path in self.output.iterdir()}
+        assert 'device2.example.com.out' in expected
+
+        self.config['render_processes'] = 2
+        with mock.patch('homer.templates.ProcessPoolExecutor.submit', autospec=True,
+                        side_effect=ProcessPoolExecutor.submit) as mocked_submit:
+            ret = homer.Homer(self.config).generate('*')
+
+        assert ret == 1
+        assert mocked_submit.called
+        assert {path.name: path.read_text() for path in self.output.iterdir()} == expected
+
     def test_execute_generate_fail_to_render(self):
         """It should skip devices that fails to render the configuration."""
         ret = self.homer.generate('site:siteC')
@@ -117,6 +143,18 @@ class TestHomer:
         assert mocked_device.return_value.cu.diff.called
         assert expected in out
 
+    @mock.patch('homer.transports.junos.JunOSDevice')
+    def test_execute_diff_connection_fail(self, mocked_device, capsys, caplog):
+        """It should skip the device that fails to connect, without attempting to connect again."""
+        mocked_device.side_effect = RuntimeError('connection error')
+        return_code = self.homer.diff('device1*')
+
+        out, _ = capsys.readouterr()
+        assert return_code == 1
+        assert 'Unable to connect to device1.example.com, skipping: connection error' in caplog.text
+        assert "Changes for 1 devices: ['device1.example.com']\n# Failed" in out
+        assert mocked_device.call_count == 1
+
     @mock.patch('homer.transports.junos.JunOSDevice')
     def test_execute_diff_raise(self, mocked_device, capsys, caplog):
         """It should skip the device that raises an HomerLoadError."""
@@ -137,6 +175,7 @@ class TestHomer:
         # TODO: to be expanded
         mocked_isatty.return_value = True
         mocked_input.return_value = 'yes'
+        mocked_device.return_value.cu.diff.return_value = 'diff'
         ret = self.homer.commit('device*', message='commit message')
         assert ret == 0
         assert mocked_device.called
@@ -173,17 +212,65 @@ class TestHomer:
         assert expected in caplog.text
         mocked_device.return_value.cu.commit.assert_not_called()
 
+    @mock.patch('builtins.input')
+    @mock.patch('homer.sys.stdout.isatty')
+    @mock.patch('homer.transports.junos.JunOSDevice')
+    def test_execute_commit_interrupted_prompt(self, mocked_device, mocked_isatty, mocked_input, caplog):
+        """It should not commit if the execution is interrupted while waiting for the confirmation."""
+        def interrupt(_):
+            self.homer._abort.set()  # pylint: disable=protected-access
+            return 'yes'
+
+        mocked_isatty.return_value = True
+        mocked_input.side_effect = interrupt
+        mocked_device.return_value.cu.diff.return_value = 'diff'
+        ret = self.homer.commit('device*', message='commit message')
+        assert ret == 1
+        assert 'Execution interrupted, commit aborted' in caplog.text
+        mocked_device.return_value.cu.commit.assert_not_called()
+        mocked_device.return_value.cu.rollback.assert_called()
+
+    @mock.patch('homer.sys.stdout.isatty')
+    @mock.patch('homer.transports.junos.JunOSDevice')
+    def test_execute_commit_unexpected_error(self, mocked_device, mocked_isatty):
+        """It should prevent the devices in progress from committing if the execution fails unexpectedly."""
+        mocked_isatty.return_value = True
+        with mock.patch('homer.Homer._process_device', side_effect=RuntimeError('unexpected')):
+            with pytest.raises(RuntimeError, match='unexpected'):
+                self.homer.commit('device*', message='commit message')
+
+        assert self.homer._abort.is_set()  # pylint: disable=protected-access
+        mocked_device.return_value.cu.commit.assert_not_called()
+
     @mock.patch('homer.sys.stdout.isatty')
     @mock.patch('homer.transports.junos.JunOSDevice')
     def test_execute_commit_notty(self, mocked_device, mocked_isatty, caplog):
-        """It should skip a device and log a warning if the commit is aborted."""
+        """It should fail without connecting to any device if not in a TTY."""
         mocked_isatty.return_value = False
         mocked_device.return_value.cu.diff.return_value = 'diff'
         ret = self.homer.commit('device*', message='commit message')
         assert ret == 1
         assert 'Not in a TTY, unable to ask for confirmation' in caplog.text
+        assert not mocked_device.called
         mocked_device.return_value.cu.commit.assert_not_called()
 
+    @mock.patch('builtins.input')
+    @mock.patch('homer.sys.stdout.isatty')
+    @mock.patch('homer.transports.junos.JunOSDevice')
+    def test_connections_released(self, mocked_device, mocked_isatty, mocked_input):
+        """It should close the connection to each device once done with it."""
+        mocked_isatty.return_value = True
+        mocked_input.return_value = 'yes'
+        mocked_device.return_value.cu.diff.return_value = 'diff'
+        with self.homer as runner:
+            assert runner.diff('device1*') == homer.DIFF_EXIT_CODE
+            mocked_device.return_value.close.assert_called_once_with()
+            assert runner.commit('device1*', message='commit message') == 0
+            assert mocked_device.call_count == 2
+            assert mocked_device.return_value.close.call_count == 2
+
+        assert mocked_device.return_value.close.call_count == 2
+
 
 class TestHomerNetbox:
     """Homer class tests with Netbox enabled."""
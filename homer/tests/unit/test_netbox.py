@@ -1,13 +1,16 @@
 """Netbox module tests."""
 # pylint: disable=attribute-defined-outside-init
+import time
+
 from collections import UserDict
+from concurrent.futures import ThreadPoolExecutor
 from unittest import mock
 
 import pytest
 
 from homer.devices import Device
 from homer.exceptions import HomerError
-from homer.netbox import BaseNetboxData, NetboxData, NetboxDeviceData, NetboxInventory
+from homer.netbox import BaseNetboxData, NetboxBulkDeviceData, NetboxData, NetboxDeviceData, NetboxInventory
 
 
 class NetboxObject:  # pylint: disable=too-many-instance-attributes
@@ -120,6 +123,19 @@ class TestNetboxData:
         self.netbox_api.ipam.vlans.all.return_value = [vlan]
         assert self.netbox_data['vlans'] == [{'id': 1}]
 
+    def test_getitem_concurrent(self):
+        """It should gather a key only once also when accessed concurrently from multiple threads."""
+        def get_vlans():
+            time.sleep(0.1)
+            return []
+
+        self.netbox_api.ipam.vlans.all.side_effect = get_vlans
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(lambda _: self.netbox_data['vlans'], range(4)))
+
+        assert results == [[], [], [], []]
+        assert self.netbox_api.ipam.vlans.all.call_count == 1
+
 
 class TestNetboxDeviceData:
     """NetboxDeviceData class tests."""
@@ -136,6 +152,11 @@ class TestNetboxDeviceData:
         assert isinstance(self.netbox_data, NetboxDeviceData)
         assert isinstance(self.netbox_data, UserDict)
 
+    def test_init_lazy(self):
+        """Creating an instance should not perform any call to the Netbox API."""
+        NetboxDeviceData(self.netbox_api, self.device)
+        assert not self.netbox_api.mock_calls
+
     def test_cached_key(self):
         """If a key has been already populated it should not call the method again."""
 
@@ -220,6 +241,67 @@ class TestNetboxDeviceData:
         # And we want the fake API to be called only once
         self.netbox_api.dcim.interfaces.filter.assert_called_once_with(device_id=123)
 
+    def test_get_inventory_bulk(self):
+        """It should get the inventory items of all the devices in bulk and fallback to the API for other devices."""
+        other_netbox_device = mock_netbox_device('device2.example.com', 'role1', 'site1', 'Active')
+        other_netbox_device.id = 456
+        other_device = Device(other_netbox_device.name, {'netbox_object': other_netbox_device}, {}, {})
+        items = []
+        for device_id in (123, 456, 123):
+            item = NetboxObject()
+            item.device = NetboxObject()
+            item.device.id = device_id
+            items.append(item)
+
+        self.netbox_api.dcim.inventory_items.filter.return_value = items
+        bulk_data = NetboxBulkDeviceData(self.netbox_api, [self.device, other_device])
+        assert [i['device'].id for i in NetboxDeviceData(
+            self.netbox_api, self.device, bulk_data=bulk_data)['inventory']] == [123, 123]
+        assert [i['device'].id for i in NetboxDeviceData(
+            self.netbox_api, other_device, bulk_data=bulk_data)['inventory']] == [456]
+        self.netbox_api.dcim.inventory_items.filter.assert_called_once_with(device_id=[123, 456])
+
+        self.netbox_api.dcim.inventory_items.filter.return_value = []
+        unknown_netbox_device = mock_netbox_device('device3.example.com', 'role1', 'site1', 'Active')
+        unknown_netbox_device.id = 789
+        unknown_device = Device(unknown_netbox_device.name, {'netbox_object': unknown_netbox_device}, {}, {})
+        assert NetboxDeviceData(self.netbox_api, unknown_device, bulk_data=bulk_data)['inventory'] == []
+        self.netbox_api.dcim.inventory_items.filter.assert_called_with(device_id=789)
+
+
+class TestNetboxBulkDeviceData:
+    """NetboxBulkDeviceData class tests."""
+
+    def setup_method(self):
+        """Initialize the test instances."""
+        self.netbox_api = mock.MagicMock()  # Can't use spec_set because of pynetbox lazy creation
+        self.devices = []
+        for i in range(150):
+            netbox_device = mock_netbox_device('device{i}.example.com'.format(i=i), 'role1', 'site1', 'Active')
+            netbox_device.id = i
+            self.devices.append(Device(netbox_device.name, {'netbox_object': netbox_device}, {}, {}))
+
+        self.devices.append(Device('nonetbox.example.com', {}, {}, {}))
+        self.bulk_data = NetboxBulkDeviceData(self.netbox_api, self.devices)
+
+    def test_get_chunked(self):
+        """It should fetch the objects for all the devices only once, splitting the device IDs in chunks."""
+        interface = NetboxObject()
+        interface.device = NetboxObject()
+        interface.device.id = 1
+        self.netbox_api.dcim.interfaces.filter.return_value = [interface]
+
+        assert self.bulk_data.get('interfaces', 1) == [interface, interface]
+        assert self.bulk_data.get('interfaces', 2) == []
+        self.netbox_api.dcim.interfaces.filter.assert_has_calls(
+            [mock.call(device_id=list(range(100))), mock.call(device_id=list(range(100, 150)))])
+        assert self.netbox_api.dcim.interfaces.filter.call_count == 2
+
+    def test_get_unknown_device(self):
+        """It should return None for devices that are not managed by the instance."""
+        assert self.bulk_data.get('interfaces', 1000) is None
+        assert not self.netbox_api.dcim.interfaces.filter.called
+
 
 class TestNetboxInventory:
     """NetboxInventory class tests."""
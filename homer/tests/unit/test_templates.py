@@ -1,4 +1,6 @@
 """Templates module tests."""
+from unittest import mock
+
 import pytest
 
 from homer.exceptions import HomerError
@@ -29,3 +31,12 @@ class TestRenderer:
             self.renderer.render('non_existent', {})
         with pytest.raises(HomerError, match='Could not render template key_error.conf'):
             self.renderer.render('key_error', {})
+
+    def test_preload(self):
+        """Should compile the existing templates only once and skip the invalid ones."""
+        with mock.patch.object(self.renderer._env, 'compile',  # pylint: disable=protected-access
+                               wraps=self.renderer._env.compile) as mocked_compile:  # pylint: disable=protected-access
+            self.renderer.preload(['valid', 'valid', 'syntax_error', 'non_existent'])
+            assert self.renderer.render('valid', {'test_key': 'test_value'}) == 'test_value;'
+
+        assert mocked_compile.call_count == 2  # valid and syntax_error
@@ -0,0 +1,96 @@
+"""Transports module tests."""
+import threading
+
+from unittest import mock
+
+import pytest
+
+from homer.transports import ConnectionPool
+
+
+class TestConnectionPool:
+    """ConnectionPool class tests."""
+
+    def setup_method(self):
+        """Initialize the test instance."""
+        # pylint: disable=attribute-defined-outside-init
+        self.pool = ConnectionPool(username='user', workers=2)
+
+    @mock.patch('homer.transports.junos.JunOSDevice')
+    def test_get_after_warmup(self, mocked_device):
+        """It should return the connection opened in advance without connecting again."""
+        self.pool.warmup('device1.example.com')
+        connection = self.pool.get('device1.example.com')
+        assert self.pool.get('device1.example.com') is connection
+        mocked_device.assert_called_once_with(host='device1.example.com', user='user', port=22, ssh_config=None)
+
+    @mock.patch('homer.transports.junos.JunOSDevice')
+    def test_get_warmup_fail(self, mocked_device):
+        """It should raise the error of the connection opened in advance without connecting again."""
+        mocked_device.side_effect = RuntimeError('connection error')
+        self.pool.warmup('device1.example.com')
+        with pytest.raises(RuntimeError, match='connection error'):
+            self.pool.get('device1.example.com')
+
+        assert mocked_device.call_count == 1
+        self.pool.release('device1.example.com')  # Nothing to close
+
+    @mock.patch('homer.transports.junos.JunOSDevice')
+    def test_release(self, mocked_device):
+        """It should close the connection and open a new one on the next request."""
+        self.pool.get('device1.example.com')
+        self.pool.release('device1.example.com')
+        mocked_device.return_value.close.assert_called_once_with()
+        self.pool.get('device1.example.com')
+        assert mocked_device.call_count == 2
+
+    @mock.patch('homer.transports.junos.JunOSDevice')
+    def test_release_while_connecting(self, mocked_device):
+        """It should not wait for a connection still being opened, closing it in the background once opened."""
+        connecting = threading.Event()
+        proceed = threading.Event()
+
+        def connect(**_):
+            connecting.set()
+            proceed.wait(timeout=5)  # Do not hang if release() waits for the connection
+            return mocked_junos_device
+
+        mocked_junos_device = mock.MagicMock()
+        mocked_device.side_effect = connect
+        self.pool.warmup('device1.example.com')
+        connecting.wait(timeout=5)
+        self.pool.release('device1.example.com')
+        mocked_junos_device.close.assert_not_called()
+
+        proceed.set()
+        self.pool.close()  # Waits for the connections being opened in the background
+        mocked_junos_device.close.assert_called_once_with()
+
+    @mock.patch('homer.transports.junos.JunOSDevice')
+    def test_release_not_started(self, mocked_device):
+        """It should cancel the opening of a connection not yet started."""
+        proceed = threading.Event()
+        mocked_device.side_effect = lambda **_: proceed.wait(timeout=5) and mock.MagicMock()
+        pool = ConnectionPool(workers=1)
+        pool.warmup('device1.example.com')
+        pool.warmup('device2.example.com')  # Queued behind the first one
+        pool.release('device2.example.com')
+        proceed.set()
+        pool.close()
+        mocked_device.assert_called_once_with(host='device1.example.com', user='', port=22, ssh_config=None)
+
+    @mock.patch('homer.transports.junos.JunOSDevice')
+    def test_close(self, mocked_device):
+        """It should close all the open connections and still allow to open new ones."""
+        # Set the mocked device in advance, as the mocks are not thread-safe when lazily creating their children
+        mocked_device.return_value = mock.MagicMock()
+        mocked_device.return_value.close.return_value = None
+        self.pool.warmup('device1.example.com')
+        self.pool.warmup('device2.example.com')
+        self.pool.get('device1.example.com')
+        self.pool.get('device2.example.com')
+        self.pool.close()
+        assert mocked_device.return_value.close.call_count == 2
+        self.pool.get('device1.example.com')
+        assert mocked_device.call_count == 3
+        self.pool.close()
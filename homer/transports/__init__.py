@@ -1 +1,138 @@
 """Transports module."""
+import threading
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover - the transport is imported only when connecting to the devices
+    from homer.transports.junos import ConnectedDevice
+
+
+class ConnectionPool:
+    """Keep track of the open connections to the devices, to share them while acting on a device."""
+
+    def __init__(self, *, username: str = '', ssh_config: Optional[str] = None, workers: int = 1):
+        """Initialize the instance.
+
+        Arguments:
+            username (str): the username to use to connect to the devices.
+            ssh_config (Optional[str]): an ssh_config file if you want other than ~/.ssh/config
+            workers (int, optional): the maximum number of connections to open in parallel.
+
+        """
+        self._username = username
+        self._ssh_config = ssh_config
+        self._workers = workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._connections: Dict[str, 'Future[ConnectedDevice]'] = {}
+        self._lock = threading.Lock()
+
+    def warmup(self, fqdn: str) -> None:
+        """Start opening the connection to the device in the background, if there isn't already one.
+
+        Arguments:
+            fqdn (str): the FQDN of the device.
+
+        """
+        self._submit(fqdn)
+
+    def get(self, fqdn: str) -> 'ConnectedDevice':
+        """Get a connection to the device, opening it only if there isn't already one open or being opened.
+
+        Arguments:
+            fqdn (str): the FQDN of the device.
+
+        Raises:
+            Exception: any error raised while connecting to the device, also if the connection was opened in advance
+            with :py:meth:`homer.transports.ConnectionPool.warmup`, without attempting to connect again.
+
+        Returns:
+            homer.transports.junos.ConnectedDevice: the connected device instance.
+
+        """
+        return self._submit(fqdn).result()
+
+    def release(self, fqdn: str) -> None:
+        """Close the connection to the device, if open, and forget it.
+
+        A connection still being opened is cancelled if not yet started, or closed in the background once opened,
+        without waiting for it.
+
+        Arguments:
+            fqdn (str): the FQDN of the device.
+
+        """
+        with self._lock:
+            future = self._connections.pop(fqdn, None)
+
+        if future is not None:
+            ConnectionPool._discard(future)
+
+    def close(self) -> None:
+        """Close all the open connections."""
+        with self._lock:
+            futures = list(self._connections.values())
+            self._connections.clear()
+            executor = self._executor
+            self._executor = None
+
+        for future in futures:
+            ConnectionPool._discard(future)
+
+        if executor is not None:
+            executor.shutdown()
+
+    def _submit(self, fqdn: str) -> 'Future[ConnectedDevice]':
+        """Get the connection to the device, submitting its opening if there isn't already one.
+
+        Arguments:
+            fqdn (str): the FQDN of the device.
+
+        Returns:
+            concurrent.futures.Future: the future of the connected device instance.
+
+        """
+        with self._lock:
+            if fqdn not in self._connections:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self._workers)
+                self._connections[fqdn] = self._executor.submit(self._connect, fqdn)
+
+            return self._connections[fqdn]
+
+    def _connect(self, fqdn: str) -> 'ConnectedDevice':
+        """Open the connection to the device.
+
+        Arguments:
+            fqdn (str): the FQDN of the device.
+
+        Returns:
+            homer.transports.junos.ConnectedDevice: the connected device instance.
+
+        """
+        # Import the transport only when needed, as it's slow to import and not needed to generate the configuration
+        from homer.transports.junos import ConnectedDevice  # pylint: disable=import-outside-toplevel
+
+        return ConnectedDevice(fqdn, username=self._username, ssh_config=self._ssh_config)
+
+    @staticmethod
+    def _discard(future: 'Future[ConnectedDevice]') -> None:
+        """Cancel the opening of the connection if not yet started, or close the connection once opened.
+
+        Arguments:
+            future (concurrent.futures.Future): the future of the connected device instance.
+
+        """
+        if not future.cancel():
+            future.add_done_callback(ConnectionPool._close)
+
+    @staticmethod
+    def _close(future: 'Future[ConnectedDevice]') -> None:
+        """Close the connection to the device, to be called once the given future is done.
+
+        Arguments:
+            future (concurrent.futures.Future): the future of the connected device instance.
+
+        """
+        if not future.cancelled() and future.exception() is None:
+            future.result().close()